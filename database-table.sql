@@ -107,4 +107,57 @@ ALTER TABLE recipes DROP COLUMN input_item_name;
 ALTER TABLE project_requirements DROP COLUMN item_name;
 ALTER TABLE user_inventory DROP COLUMN item_name;
 
-COMMIT;
\ No newline at end of file
+COMMIT;
+
+-- 7. Per-item global stock, kept in sync by trigger so totals are a single-row lookup.
+-- Trade-off: every user_inventory write now also updates the item's shared item_totals row
+-- and holds its lock until commit, so concurrent writers to the same item queue on it.
+-- Multi-row writes must touch items in a fixed order (the bot sorts by item id) or two
+-- overlapping pastes can deadlock.
+CREATE TABLE IF NOT EXISTS item_totals (
+    item_id INT PRIMARY KEY REFERENCES items(id),
+    total BIGINT NOT NULL DEFAULT 0
+);
+ALTER TABLE item_totals ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION sync_item_totals() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE item_totals SET total = total - OLD.quantity WHERE item_id = OLD.item_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO item_totals (item_id, total) VALUES (NEW.item_id, NEW.quantity)
+        ON CONFLICT (item_id) DO UPDATE SET total = item_totals.total + EXCLUDED.total;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE (used by /wipe_all_user_stock) does not fire row triggers
+CREATE OR REPLACE FUNCTION reset_item_totals() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM item_totals;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS user_inventory_totals ON user_inventory;
+CREATE TRIGGER user_inventory_totals AFTER INSERT OR UPDATE OR DELETE ON user_inventory
+    FOR EACH ROW EXECUTE FUNCTION sync_item_totals();
+
+DROP TRIGGER IF EXISTS user_inventory_totals_truncate ON user_inventory;
+CREATE TRIGGER user_inventory_totals_truncate AFTER TRUNCATE ON user_inventory
+    FOR EACH STATEMENT EXECUTE FUNCTION reset_item_totals();
+
+-- Backfill from existing inventory
+INSERT INTO item_totals (item_id, total)
+SELECT item_id, SUM(quantity) FROM user_inventory GROUP BY item_id
+ON CONFLICT (item_id) DO UPDATE SET total = EXCLUDED.total;
+
+-- 8. /locate top holders: ORDER BY quantity DESC LIMIT per item as an index-only scan.
+-- Totals come from item_totals, so the index only needs rows still holding stock.
+CREATE INDEX IF NOT EXISTS ui_item_top_holders ON user_inventory (item_id, quantity DESC) INCLUDE (user_id) WHERE quantity > 0;
+
+-- 9. Recipe per output item: the dashboard query looks one up for every requirement.
+-- The newest recipe wins if an item was given several; the index serves that lookup directly.
+CREATE INDEX IF NOT EXISTS recipes_output_idx ON recipes (output_item_id, id DESC) INCLUDE (input_item_id, quantity_required);
\ No newline at end of file
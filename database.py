@@ -1,93 +1,274 @@
 import asyncpg
 import logging
+import time
+from itertools import islice
 
 # Set up a logger for database errors
 logger = logging.getLogger("Database")
 
+AUTOCOMPLETE_LIMIT = 25
+AUTOCOMPLETE_TTL_SECONDS = 30
+AUTOCOMPLETE_CACHE_SIZE = 1024
+
 class DatabaseManager:
     """
     Handles all interactions with the Supabase PostgreSQL database.
     """
     def __init__(self, pool: asyncpg.Pool):
         self.pool = pool
+        # name -> id. Items are never renamed or deleted, so entries stay valid.
+        self._item_ids: dict[str, int] = {}
+        # project name -> id. Projects are never renamed or deleted either.
+        self._project_ids: dict[str, int] = {}
+        # table -> (fetched_at, [(lowercased, name), ...]). Full item/project name lists, filtered in Python.
+        self._name_lists: dict[str, tuple[float, list[tuple[str, str]]]] = {}
+        # (fetched_at, names) of the most-stocked items; dropped on any stock change
+        self._popular: tuple[float, list[str]] | None = None
+        # (kind, user_id, lowercased search text) -> (fetched_at, names)
+        self._autocomplete_cache: dict[tuple, tuple[float, list[str]]] = {}
+        # output item name -> {input_item_name, quantity_required}; newest recipe wins
+        self._recipes: dict[str, dict] = {}
+        # guild_id -> dashboard config (or None). Only /dashboard_set changes it.
+        self._dashboard_configs: dict[int, dict | None] = {}
+
+    # --- HELPER: Autocomplete Cache ---
+    async def _all_names(self, table: str) -> list[tuple[str, str]]:
+        """
+        Every name in `table` ('items' or 'projects') paired with its lowercased
+        form, so keystrokes don't re-lowercase the whole list. Refreshed at most
+        every TTL seconds.
+        """
+        cached = self._name_lists.get(table)
+        if cached and time.monotonic() - cached[0] < AUTOCOMPLETE_TTL_SECONDS:
+            return cached[1]
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f"SELECT name FROM {table} ORDER BY name")
+        names = [(r['name'].lower(), r['name']) for r in rows]
+        self._name_lists[table] = (time.monotonic(), names)
+        return names
+
+    async def _search_names(self, table: str, text: str) -> list[str]:
+        """
+        Up to AUTOCOMPLETE_LIMIT names in `table` containing the (lowercased) text.
+        Names starting with the text are listed first, then the other matches.
+        """
+        names = await self._all_names(table)
+        matches = list(islice((name for lowered, name in names if lowered.startswith(text)), AUTOCOMPLETE_LIMIT))
+        if len(matches) < AUTOCOMPLETE_LIMIT:
+            rest = (name for lowered, name in names if text in lowered and not lowered.startswith(text))
+            matches.extend(islice(rest, AUTOCOMPLETE_LIMIT - len(matches)))
+        return matches
+
+    def _cached_autocomplete(self, kind: str, owner, text: str):
+        """
+        Returns cached names for this search text, or None on a miss.
+        A fresh, untruncated result for the text minus its last characters
+        (what the user typed a moment ago) is narrowed in Python.
+        """
+        now = time.monotonic()
+        for end in range(len(text), -1, -1):
+            hit = self._autocomplete_cache.get((kind, owner, text[:end]))
+            if hit is None or now - hit[0] >= AUTOCOMPLETE_TTL_SECONDS:
+                continue
+            if end == len(text):
+                return hit[1]
+            if len(hit[1]) < AUTOCOMPLETE_LIMIT:
+                return [name for name in hit[1] if text in name.lower()]
+            return None
+        return None
+
+    def _store_autocomplete(self, kind: str, owner, text: str, names: list[str]):
+        if len(self._autocomplete_cache) >= AUTOCOMPLETE_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._autocomplete_cache.pop(next(iter(self._autocomplete_cache)))
+        self._autocomplete_cache[(kind, owner, text)] = (time.monotonic(), names)
+
+    def _invalidate_autocomplete(self, kind: str, owner=None):
+        """Drops cached entries of one kind (optionally only for one user)."""
+        self._name_lists.pop(kind, None)
+        self._autocomplete_cache = {
+            key: value for key, value in self._autocomplete_cache.items()
+            if key[0] != kind or (owner is not None and key[1] != owner)
+        }
 
     # --- HELPER: Resolve Name to ID ---
-    async def get_or_create_item_id(self, conn, item_name: str) -> int:
+    async def load_name_caches(self):
+        """
+        Warms the item and project name -> id caches, and the autocomplete
+        name lists, so the first keystrokes don't wait on a query.
+        Called once at startup.
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT id, name FROM items ORDER BY name")
+            projects = await conn.fetch("SELECT id, name FROM projects ORDER BY name")
+        self._item_ids.update({r['name']: r['id'] for r in rows})
+        self._project_ids.update({r['name']: r['id'] for r in projects})
+        now = time.monotonic()
+        for table, records in (("items", rows), ("projects", projects)):
+            self._name_lists[table] = (now, [(r['name'].lower(), r['name']) for r in records])
+
+    async def _write_with_item_id(self, conn, item_name: str, write):
         """
-        Helper to get an Item ID. If the item doesn't exist, it creates it.
-        NOTE: Expects an open connection (conn) to be passed in.
+        Runs `await write(item_id)`. If the item has to be created first, the
+        item insert and the write share one transaction, so a new item costs
+        one commit and is never left behind by a failed write.
         """
-        # We use an 'upsert' pattern here that guarantees an ID is returned
-        return await conn.fetchval("""
-            INSERT INTO items (name) VALUES ($1) 
-            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name 
-            RETURNING id
-        """, item_name)
+        item_id = self._item_ids.get(item_name)
+        if item_id is not None:
+            return await write(item_id)
+        async with conn.transaction():
+            item_id = await conn.fetchval("""
+                INSERT INTO items (name) VALUES ($1) 
+                ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name 
+                RETURNING id
+            """, item_name)
+            result = await write(item_id)
+        self._item_ids[item_name] = item_id
+        self._invalidate_autocomplete("items")
+        return result
 
     async def get_item_id_by_name(self, item_name: str) -> int:
         """Read-only lookup. Returns None if not found."""
-        async with self.pool.acquire() as conn:
-            return await conn.fetchval("SELECT id FROM items WHERE name = $1", item_name)
+        item_id = self._item_ids.get(item_name)
+        if item_id is None:
+            async with self.pool.acquire() as conn:
+                item_id = await conn.fetchval("SELECT id FROM items WHERE name = $1", item_name)
+            if item_id is not None:
+                self._item_ids[item_name] = item_id
+        return item_id
 
     # --- USER INVENTORY ---
-    async def update_user_stock(self, user_id: int, item_name: str, quantity: int):
-        """Used by /deposit_item and bulk update."""
-        async with self.pool.acquire() as conn:
-            item_id = await self.get_or_create_item_id(conn, item_name)
-            await conn.execute("""
-                INSERT INTO user_inventory (user_id, item_id, quantity)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (user_id, item_id) 
-                DO UPDATE SET quantity = user_inventory.quantity + $3, last_updated = NOW()
-            """, user_id, item_id, quantity)
-
-    async def set_user_stock(self, user_id: int, item_name: str, quantity: int):
-        """Used by /modify_item_qty (overwrites value)."""
-        async with self.pool.acquire() as conn:
-            item_id = await self.get_or_create_item_id(conn, item_name)
-            if quantity == 0:
-                await conn.execute("DELETE FROM user_inventory WHERE user_id = $1 AND item_id = $2", user_id, item_id)
-            else:
-                await conn.execute("""
+    async def update_user_stock(self, user_id: int, item_name: str, quantity: int) -> tuple[int, int]:
+        """
+        Used by /deposit_item and /admin_deposit.
+        Returns (new_user_balance, new_global_total).
+        """
+        async with self.pool.acquire() as conn:
+            # item_totals is read from the pre-write snapshot, so the deposit is added on top
+            row = await self._write_with_item_id(conn, item_name, lambda item_id: conn.fetchrow("""
+                WITH upsert AS (
                     INSERT INTO user_inventory (user_id, item_id, quantity)
                     VALUES ($1, $2, $3)
                     ON CONFLICT (user_id, item_id) 
-                    DO UPDATE SET quantity = $3, last_updated = NOW()
-                """, user_id, item_id, quantity)
+                    DO UPDATE SET quantity = user_inventory.quantity + EXCLUDED.quantity, last_updated = NOW()
+                    RETURNING quantity
+                )
+                SELECT
+                    (SELECT quantity FROM upsert) as new_qty,
+                    COALESCE((SELECT total FROM item_totals WHERE item_id = $2), 0) + $3 as global_total
+            """, user_id, item_id, quantity))
+        self._invalidate_autocomplete("user_items", user_id)
+        self._popular = None
+        return row['new_qty'], row['global_total']
+
+    async def bulk_update_user_stock(self, user_id: int, rows: list[tuple[str, int]]):
+        """Used by /update_stock. Adds every (item_name, quantity) pair in one transaction."""
+        # Repeated names are summed up front so each inventory row is touched once
+        merged = {}
+        for name, qty in rows:
+            merged[name] = merged.get(name, 0) + qty
+        # Rows are written in a fixed order (item id, names sorted until ids are known): every
+        # write also locks the item's shared item_totals row, and two pastes locking the same
+        # items in different orders would deadlock
+        names = sorted(merged)
+        # Only names never seen before need registering in items
+        unknown = [name for name in names if name not in self._item_ids]
+        created = []
+        async with self.pool.acquire() as conn:
+            if not unknown:
+                # Every id is cached: one autocommit statement, no BEGIN/COMMIT round-trips
+                ids = sorted((self._item_ids[name], qty) for name, qty in merged.items())
+                await conn.execute("""
+                    INSERT INTO user_inventory (user_id, item_id, quantity)
+                    SELECT $1, t.item_id, t.quantity
+                    FROM unnest($2::int[], $3::int[]) AS t(item_id, quantity)
+                    ON CONFLICT (user_id, item_id) 
+                    DO UPDATE SET quantity = user_inventory.quantity + EXCLUDED.quantity, last_updated = NOW()
+                """, user_id, [item_id for item_id, _ in ids], [qty for _, qty in ids])
+            else:
+                async with conn.transaction():
+                    created = await conn.fetch("""
+                        INSERT INTO items (name) SELECT unnest($1::text[])
+                        ON CONFLICT (name) DO NOTHING
+                        RETURNING id, name
+                    """, unknown)
+                    await conn.execute("""
+                        INSERT INTO user_inventory (user_id, item_id, quantity)
+                        SELECT $1, i.id, t.quantity
+                        FROM unnest($2::text[], $3::int[]) AS t(name, quantity)
+                        JOIN items i ON i.name = t.name
+                        ORDER BY i.id
+                        ON CONFLICT (user_id, item_id) 
+                        DO UPDATE SET quantity = user_inventory.quantity + EXCLUDED.quantity, last_updated = NOW()
+                    """, user_id, names, [merged[name] for name in names])
+        # Only cache ids once the transaction has committed
+        self._item_ids.update({r['name']: r['id'] for r in created})
+        if unknown:
+            self._invalidate_autocomplete("items")
+        self._invalidate_autocomplete("user_items", user_id)
+        self._popular = None
+
+    async def set_user_stock(self, user_id: int, item_name: str, quantity: int) -> tuple[int, int]:
+        """
+        Used by /modify_item_qty (overwrites value).
+        Returns (new_user_balance, new_global_total).
+        """
+        async with self.pool.acquire() as conn:
+            # One statement: a zero quantity deletes the row, anything else upserts it.
+            # Sub-selects see the pre-write snapshot, so the old balance is swapped out of the total.
+            total = await self._write_with_item_id(conn, item_name, lambda item_id: conn.fetchval("""
+                WITH old AS (
+                    SELECT quantity FROM user_inventory WHERE user_id = $1 AND item_id = $2
+                ), del AS (
+                    DELETE FROM user_inventory
+                    WHERE $3 = 0 AND user_id = $1 AND item_id = $2
+                ), upsert AS (
+                    INSERT INTO user_inventory (user_id, item_id, quantity)
+                    SELECT $1, $2, $3 WHERE $3 > 0
+                    ON CONFLICT (user_id, item_id) 
+                    DO UPDATE SET quantity = EXCLUDED.quantity, last_updated = NOW()
+                )
+                SELECT COALESCE((SELECT total FROM item_totals WHERE item_id = $2), 0)
+                     - COALESCE((SELECT quantity FROM old), 0) + $3
+            """, user_id, item_id, quantity))
+        self._invalidate_autocomplete("user_items", user_id)
+        self._popular = None
+        return quantity, total
                 
     async def withdraw_user_stock(self, user_id: int, item_name: str, amount: int) -> tuple[int, int]:
         """
         Returns (new_user_balance, new_global_total).
         Raises ValueError if insufficient funds.
         """
-        async with self.pool.acquire() as conn:
-            # 1. Get ID (Strict, don't create)
-            item_id = await conn.fetchval("SELECT id FROM items WHERE name = $1", item_name)
-            if not item_id:
-                raise ValueError(f"Item '{item_name}' does not exist.")
-
-            # 2. Check Balance
-            current_qty = await conn.fetchval("""
-                SELECT quantity FROM user_inventory WHERE user_id = $1 AND item_id = $2
-            """, user_id, item_id)
-            
-            if current_qty is None or current_qty < amount:
-                raise ValueError(f"Insufficient funds. You have {current_qty or 0}.")
+        item_id = await self.get_item_id_by_name(item_name)
+        if item_id is None:
+            raise ValueError(f"Item '{item_name}' does not exist.")
 
-            # 3. Withdraw
-            new_qty = current_qty - amount
-            if new_qty == 0:
-                await conn.execute("DELETE FROM user_inventory WHERE user_id = $1 AND item_id = $2", user_id, item_id)
-            else:
-                await conn.execute("""
-                    UPDATE user_inventory SET quantity = $3, last_updated = NOW()
-                    WHERE user_id = $1 AND item_id = $2
-                """, user_id, item_id, new_qty)
+        async with self.pool.acquire() as conn:
+            # One statement: exactly one of del/upd can match, so the balance check
+            # and the write happen atomically. Sub-selects see the pre-write snapshot.
+            row = await conn.fetchrow("""
+                WITH del AS (
+                    DELETE FROM user_inventory
+                    WHERE user_id = $1 AND item_id = $2 AND quantity = $3
+                    RETURNING 0 as quantity
+                ), upd AS (
+                    UPDATE user_inventory SET quantity = quantity - $3, last_updated = NOW()
+                    WHERE user_id = $1 AND item_id = $2 AND quantity > $3
+                    RETURNING quantity
+                )
+                SELECT
+                    (SELECT quantity FROM user_inventory WHERE user_id = $1 AND item_id = $2) as current_qty,
+                    (SELECT quantity FROM del UNION ALL SELECT quantity FROM upd) as new_qty,
+                    COALESCE((SELECT total FROM item_totals WHERE item_id = $2), 0) as old_total
+            """, user_id, item_id, amount)
 
-            # 4. Get Global Total
-            global_total = await conn.fetchval("SELECT SUM(quantity) FROM user_inventory WHERE item_id = $1", item_id) or 0
-            
-            return new_qty, global_total
+        if row['new_qty'] is None:
+            raise ValueError(f"Insufficient funds. You have {row['current_qty'] or 0}.")
+        if row['new_qty'] == 0:
+            self._invalidate_autocomplete("user_items", user_id)
+            self._popular = None
+        return row['new_qty'], row['old_total'] - amount
 
     async def get_user_inventory(self, user_id: int):
         """Returns list of records {item_name, quantity}"""
@@ -103,65 +284,146 @@ class DatabaseManager:
     async def wipe_all_inventory(self):
         async with self.pool.acquire() as conn:
             await conn.execute("TRUNCATE TABLE user_inventory")
+        self._invalidate_autocomplete("user_items")
+        self._popular = None
 
     # --- LOOKUPS & TOTALS ---
-    async def get_global_total(self, item_name: str) -> int:
-        async with self.pool.acquire() as conn:
-            return await conn.fetchval("""
-                SELECT COALESCE(SUM(ui.quantity), 0) 
-                FROM user_inventory ui
-                JOIN items i ON ui.item_id = i.id
-                WHERE i.name = $1
-            """, item_name)
-
     async def get_top_holders(self, item_name: str, limit: int = 10):
+        """Returns records {user_id, quantity, total}; `total` is the item's global stock on every row."""
+        item_id = await self.get_item_id_by_name(item_name)
+        if item_id is None:
+            return []
         async with self.pool.acquire() as conn:
             return await conn.fetch("""
-                SELECT ui.user_id, ui.quantity 
-                FROM user_inventory ui
-                JOIN items i ON ui.item_id = i.id
-                WHERE i.name = $1 AND ui.quantity > 0 
-                ORDER BY ui.quantity DESC LIMIT $2
-            """, item_name, limit)
+                SELECT user_id, quantity,
+                       (SELECT total FROM item_totals WHERE item_id = $1) as total
+                FROM user_inventory
+                WHERE item_id = $1 AND quantity > 0 
+                ORDER BY quantity DESC LIMIT $2
+            """, item_id, limit)
 
-    async def item_autocomplete(self, current: str):
+    async def _popular_items(self) -> list[str]:
+        """Most-stocked item names, refreshed at most every TTL seconds."""
+        cached = self._popular
+        if cached and time.monotonic() - cached[0] < AUTOCOMPLETE_TTL_SECONDS:
+            return cached[1]
         async with self.pool.acquire() as conn:
-            return await conn.fetch("SELECT name FROM items WHERE name ILIKE $1 LIMIT 25", f"%{current}%")
+            rows = await conn.fetch("""
+                SELECT i.name FROM item_totals t
+                JOIN items i ON t.item_id = i.id
+                WHERE t.total > 0
+                ORDER BY t.total DESC LIMIT $1
+            """, AUTOCOMPLETE_LIMIT)
+        names = [r['name'] for r in rows]
+        self._popular = (time.monotonic(), names)
+        return names
+
+    async def item_autocomplete(self, current: str) -> list[str]:
+        text = current.lower()
+        if not text:
+            # Nothing typed yet: suggest what the org actually holds the most of
+            popular = await self._popular_items()
+            if popular: return popular
+        return await self._search_names("items", text)
         
-    async def get_user_items_autocomplete(self, user_id: int, current: str):
+    async def get_user_items_autocomplete(self, user_id: int, current: str) -> list[str]:
         """Finds items ONLY in a specific user's inventory."""
-        async with self.pool.acquire() as conn:
-            return await conn.fetch("""
-                SELECT i.name 
-                FROM user_inventory ui
-                JOIN items i ON ui.item_id = i.id
-                WHERE ui.user_id = $1 AND ui.quantity > 0 AND i.name ILIKE $2
-                ORDER BY i.name ASC
-                LIMIT 25
-            """, user_id, f"%{current}%")
+        text = current.lower()
+        names = self._cached_autocomplete("user_items", user_id, text)
+        if names is None:
+            async with self.pool.acquire() as conn:
+                records = await conn.fetch("""
+                    SELECT i.name 
+                    FROM user_inventory ui
+                    JOIN items i ON ui.item_id = i.id
+                    WHERE ui.user_id = $1 AND ui.quantity > 0 AND i.name ILIKE $2
+                    ORDER BY i.name ASC
+                    LIMIT 25
+                """, user_id, f"%{text}%")
+            names = [r['name'] for r in records]
+            self._store_autocomplete("user_items", user_id, text, names)
+        return names
         
     # --- PROJECTS & RECIPES ---
     async def create_project(self, name: str):
         async with self.pool.acquire() as conn:
-            await conn.execute("INSERT INTO projects (name) VALUES ($1)", name)
+            self._project_ids[name] = await conn.fetchval("INSERT INTO projects (name) VALUES ($1) RETURNING id", name)
+        self._invalidate_autocomplete("projects")
 
-    async def project_autocomplete(self, current: str):
-        async with self.pool.acquire() as conn:
-            return await conn.fetch("SELECT name FROM projects WHERE name ILIKE $1 LIMIT 25", f"%{current}%")
+    async def get_project_id(self, project_name: str) -> int:
+        """Read-only lookup. Returns None if not found."""
+        project_id = self._project_ids.get(project_name)
+        if project_id is None:
+            async with self.pool.acquire() as conn:
+                project_id = await conn.fetchval("SELECT id FROM projects WHERE name = $1", project_name)
+            if project_id is not None:
+                self._project_ids[project_name] = project_id
+        return project_id
+
+    async def project_autocomplete(self, current: str) -> list[str]:
+        text = current.lower()
+        return await self._search_names("projects", text)
 
     async def add_project_requirement(self, project_name: str, item_name: str, amount: int):
+        item_id = self._item_ids.get(item_name)
         async with self.pool.acquire() as conn:
-            project = await conn.fetchrow("SELECT id FROM projects WHERE name = $1", project_name)
-            if not project:
-                raise ValueError(f"Project '{project_name}' not found.")
-            
-            item_id = await self.get_or_create_item_id(conn, item_name)
-            
-            await conn.execute("""
-                INSERT INTO project_requirements (project_id, item_id, target_amount)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (project_id, item_id) DO UPDATE SET target_amount = $3
-            """, project['id'], item_id, amount)
+            if item_id is not None:
+                # Known item: nothing to write to items, just resolve the project inline
+                saved_id = await conn.fetchval("""
+                    INSERT INTO project_requirements (project_id, item_id, target_amount)
+                    SELECT id, $2, $3 FROM projects WHERE name = $1
+                    ON CONFLICT (project_id, item_id) DO UPDATE SET target_amount = EXCLUDED.target_amount
+                    RETURNING item_id
+                """, project_name, item_id, amount)
+            else:
+                # Project lookup, item upsert and requirement upsert in one round-trip.
+                # The item is only registered if the project exists.
+                saved_id = await conn.fetchval("""
+                    WITH project AS (
+                        SELECT id FROM projects WHERE name = $1
+                    ), item AS (
+                        INSERT INTO items (name) SELECT $2 WHERE EXISTS (SELECT 1 FROM project)
+                        ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                        RETURNING id
+                    )
+                    INSERT INTO project_requirements (project_id, item_id, target_amount)
+                    SELECT project.id, item.id, $3 FROM project, item
+                    ON CONFLICT (project_id, item_id) DO UPDATE SET target_amount = EXCLUDED.target_amount
+                    RETURNING item_id
+                """, project_name, item_name, amount)
+        if saved_id is None:
+            raise ValueError(f"Project '{project_name}' not found.")
+        if item_id is None:
+            self._item_ids[item_name] = saved_id
+            self._invalidate_autocomplete("items")
+
+    async def bulk_set_project_requirements(self, project_name: str, rows: list[tuple[str, int]]):
+        """Used by /project_item_bulk_edit. Upserts every (item_name, amount) pair in one transaction."""
+        # Last line wins when the same item is pasted twice
+        merged = dict(rows)
+        names = list(merged)
+        # Only names never seen before need registering in items
+        unknown = [name for name in names if name not in self._item_ids]
+        project_id = await self.get_project_id(project_name)
+        if project_id is None:
+            raise ValueError(f"Project '{project_name}' not found.")
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                created = await conn.fetch("""
+                    INSERT INTO items (name) SELECT unnest($1::text[])
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING id, name
+                """, unknown) if unknown else []
+                await conn.execute("""
+                    INSERT INTO project_requirements (project_id, item_id, target_amount)
+                    SELECT $1, i.id, t.amount
+                    FROM unnest($2::text[], $3::int[]) AS t(name, amount)
+                    JOIN items i ON i.name = t.name
+                    ON CONFLICT (project_id, item_id) DO UPDATE SET target_amount = EXCLUDED.target_amount
+                """, project_id, names, list(merged.values()))
+        self._item_ids.update({r['name']: r['id'] for r in created})
+        if unknown:
+            self._invalidate_autocomplete("items")
 
     async def get_project_requirements(self, project_name: str):
         async with self.pool.acquire() as conn:
@@ -174,48 +436,128 @@ class DatabaseManager:
                 ORDER BY i.name
             """, project_name)
 
+    async def get_project_status(self, project_name: str):
+        """
+        Returns one row per requirement with everything the dashboard needs:
+        {item_name, target_amount, direct, input_item_name, quantity_required, raw_total}
+        """
+        async with self.pool.acquire() as conn:
+            return await conn.fetch("""
+                SELECT i.name as item_name, pr.target_amount,
+                       COALESCE(direct.total, 0) as direct,
+                       input_i.name as input_item_name, r.quantity_required,
+                       COALESCE(raw.total, 0) as raw_total
+                FROM project_requirements pr
+                JOIN projects p ON pr.project_id = p.id
+                JOIN items i ON pr.item_id = i.id
+                LEFT JOIN item_totals direct ON direct.item_id = pr.item_id
+                LEFT JOIN LATERAL (
+                    SELECT input_item_id, quantity_required FROM recipes
+                    WHERE output_item_id = pr.item_id ORDER BY id DESC LIMIT 1
+                ) r ON TRUE
+                LEFT JOIN items input_i ON r.input_item_id = input_i.id
+                LEFT JOIN item_totals raw ON raw.item_id = r.input_item_id
+                WHERE p.name = $1
+                ORDER BY i.name
+            """, project_name)
+
     async def add_recipe(self, output_item: str, input_item: str, ratio: int):
+        output_id = self._item_ids.get(output_item)
+        input_id = self._item_ids.get(input_item)
+        new_items = output_id is None or input_id is None
+        rows = []
         async with self.pool.acquire() as conn:
-            out_id = await self.get_or_create_item_id(conn, output_item)
-            in_id = await self.get_or_create_item_id(conn, input_item)
-            
-            await conn.execute("""
-                INSERT INTO recipes (output_item_id, input_item_id, quantity_required)
-                VALUES ($1, $2, $3)
-            """, out_id, in_id, ratio)
-            
-    async def get_recipe(self, output_item_name: str):
+            if not new_items:
+                # Both ids cached: leave the items table untouched
+                await conn.execute("""
+                    INSERT INTO recipes (output_item_id, input_item_id, quantity_required) VALUES ($1, $2, $3)
+                """, output_id, input_id, ratio)
+            else:
+                # Upsert both item names and insert the recipe in one round-trip;
+                # the item ids come back so the name -> id cache stays warm
+                rows = await conn.fetch("""
+                    WITH names (name) AS (
+                        VALUES ($1::text), ($2::text)
+                    ), ups AS (
+                        INSERT INTO items (name) SELECT DISTINCT name FROM names
+                        ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                        RETURNING id, name
+                    ), recipe AS (
+                        INSERT INTO recipes (output_item_id, input_item_id, quantity_required)
+                        SELECT (SELECT id FROM ups WHERE name = $1), (SELECT id FROM ups WHERE name = $2), $3
+                    )
+                    SELECT id, name FROM ups
+                """, output_item, input_item, ratio)
+        self._item_ids.update({r['name']: r['id'] for r in rows})
+        self._recipes[output_item] = {'input_item_name': input_item, 'quantity_required': ratio}
+        if new_items:
+            self._invalidate_autocomplete("items")
+
+    async def load_recipes(self):
+        """Loads every recipe into memory. Called once at startup; add_recipe keeps it current."""
         async with self.pool.acquire() as conn:
-             return await conn.fetchrow("""
-                SELECT input_i.name as input_item_name, r.quantity_required
+            rows = await conn.fetch("""
+                SELECT output_i.name as output_item_name, input_i.name as input_item_name, r.quantity_required
                 FROM recipes r
                 JOIN items output_i ON r.output_item_id = output_i.id
                 JOIN items input_i ON r.input_item_id = input_i.id
-                WHERE output_i.name = $1
-            """, output_item_name)
+                ORDER BY r.id
+            """)
+        # Ordered by id, so later (newer) recipes overwrite older ones
+        self._recipes = {
+            r['output_item_name']: {'input_item_name': r['input_item_name'], 'quantity_required': r['quantity_required']}
+            for r in rows
+        }
+
+    async def get_recipe(self, output_item_name: str):
+        """Returns {input_item_name, quantity_required} or None."""
+        return self._recipes.get(output_item_name)
 
     # --- DASHBOARD CONFIG ---
     async def set_dashboard_config(self, guild_id: int, channel_id: int, message_id: int, project_name: str):
         async with self.pool.acquire() as conn:
-            project = await conn.fetchrow("SELECT id FROM projects WHERE name = $1", project_name)
-            if not project:
-                raise ValueError("Project not found")
-                
-            await conn.execute("""
+            # Project lookup and config upsert as one statement (one commit)
+            status = await conn.execute("""
                 INSERT INTO server_config (guild_id, dashboard_channel_id, dashboard_message_id, active_project_id)
-                VALUES ($1, $2, $3, $4)
+                SELECT $1, $2, $3, id FROM projects WHERE name = $4
                 ON CONFLICT (guild_id) 
                 DO UPDATE SET 
-                    dashboard_channel_id = $2,
-                    dashboard_message_id = $3,
-                    active_project_id = $4
-            """, guild_id, channel_id, message_id, project['id'])
+                    dashboard_channel_id = EXCLUDED.dashboard_channel_id,
+                    dashboard_message_id = EXCLUDED.dashboard_message_id,
+                    active_project_id = EXCLUDED.active_project_id
+            """, guild_id, channel_id, message_id, project_name)
+            if status.endswith(" 0"):
+                raise ValueError("Project not found")
+        self._dashboard_configs[guild_id] = {
+            'dashboard_channel_id': channel_id,
+            'dashboard_message_id': message_id,
+            'project_name': project_name,
+        }
+
+    async def load_dashboard_configs(self):
+        """Warms the guild -> dashboard config cache. Called once at startup."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT sc.guild_id, sc.dashboard_channel_id, sc.dashboard_message_id, p.name as project_name
+                FROM server_config sc
+                JOIN projects p ON sc.active_project_id = p.id
+            """)
+        for r in rows:
+            config = dict(r)
+            self._dashboard_configs[config.pop('guild_id')] = config
+        return list(self._dashboard_configs)
 
     async def get_dashboard_config(self, guild_id: int):
+        """Returns {dashboard_channel_id, dashboard_message_id, project_name} or None."""
+        if guild_id in self._dashboard_configs:
+            return self._dashboard_configs[guild_id]
         async with self.pool.acquire() as conn:
-            return await conn.fetchrow("""
+            row = await conn.fetchrow("""
                 SELECT sc.dashboard_channel_id, sc.dashboard_message_id, p.name as project_name
                 FROM server_config sc
                 JOIN projects p ON sc.active_project_id = p.id
                 WHERE sc.guild_id = $1
-            """, guild_id)
\ No newline at end of file
+            """, guild_id)
+        config = dict(row) if row else None
+        self._dashboard_configs[guild_id] = config
+        return config
\ No newline at end of file
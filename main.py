@@ -1,10 +1,14 @@
 import discord
 from discord.ext import commands
+from discord import app_commands
 import os
+import sys
+import asyncio
 import asyncpg
 import logging
 from dotenv import load_dotenv
 from database import DatabaseManager
+from src.utils import schedule_dashboard_update
 
 # --- SETUP LOGGING ---
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +17,15 @@ logger = logging.getLogger("Main")
 load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DATABASE_URL = os.getenv("DATABASE_URL")
+# PgBouncer in transaction mode (e.g. Supabase pooler on port 6543) can't keep named
+# prepared statements, so the cache must be off there. Direct and session-mode
+# connections reuse parsed statements instead of re-parsing every query.
+PGBOUNCER_TXN = os.getenv("PGBOUNCER_TXN") == "1"
+STATEMENT_CACHE_SIZE = 0 if PGBOUNCER_TXN else int(os.getenv("DB_STATEMENT_CACHE_SIZE", 1024))
+# Pool bounds. Each connection is a Postgres backend (or a pooler client slot on Supabase),
+# so keep the max small on free tiers; the bot rarely needs more than a handful at once.
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
 GUILD_ID = int(os.getenv("GUILD_ID"))
 MY_GUILD = discord.Object(id=GUILD_ID)
 
@@ -26,8 +39,15 @@ class LogisticsBot(commands.Bot):
 
     async def setup_hook(self):
         # 1. Init Database
-        pool = await asyncpg.create_pool(dsn=DATABASE_URL, min_size=1, max_size=10, statement_cache_size=0)
+        # A single pool is shared by every cog through self.db
+        # The bot runs a fixed set of queries; keep their prepared statements for the life of
+        # each connection rather than re-preparing them every 5 minutes (asyncpg's default)
+        pool = await asyncpg.create_pool(dsn=DATABASE_URL, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE, command_timeout=30,
+                                         statement_cache_size=STATEMENT_CACHE_SIZE, max_cacheable_statement_size=15 * 1024,
+                                         max_cached_statement_lifetime=0)
         self.db = DatabaseManager(pool)
+        await self.db.load_name_caches()
+        await self.db.load_recipes()
         logger.info("Database connected.")
 
         # 2. Load Cogs
@@ -41,8 +61,28 @@ class LogisticsBot(commands.Bot):
         await self.tree.sync(guild=MY_GUILD)
         logger.info(f"Commands synced to Guild {GUILD_ID}")
 
+    async def close(self):
+        # Release pooled connections before the event loop shuts down
+        if self.db:
+            await self.db.pool.close()
+        await super().close()
+
     async def on_ready(self):
         logger.info(f'Logged in as {self.user}')
+        # Re-render every live dashboard once: picks up changes made while the bot
+        # was offline and leaves the embed cache warm for the first /status
+        for guild_id in await self.db.load_dashboard_configs():
+            guild = self.get_guild(guild_id)
+            if guild: schedule_dashboard_update(self, guild)
+
+# uvloop is a faster drop-in event loop for asyncpg/aiohttp; not available on Windows
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop.")
+    except ImportError:
+        logger.warning("uvloop not installed, using the default asyncio event loop.")
 
 bot = LogisticsBot()
 
@@ -54,5 +94,8 @@ async def on_app_command_error(interaction: discord.Interaction, error):
         logger.error(f"Command Error: {error}")
         if not interaction.response.is_done():
             await interaction.response.send_message("❌ Internal Error.", ephemeral=True)
+        else:
+            # Deferred handlers would otherwise be left "thinking" forever
+            await interaction.followup.send("❌ Internal Error.", ephemeral=True)
 
 bot.run(DISCORD_TOKEN)
\ No newline at end of file
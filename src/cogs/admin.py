@@ -1,7 +1,8 @@
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
-from src.utils import is_officer, project_autocomplete, item_autocomplete, build_dashboard_embed, update_dashboard_message
+from src.utils import is_officer, project_autocomplete, item_autocomplete, build_dashboard_embed, schedule_dashboard_update, invalidate_project_items, remember_dashboard_message, followup_error
 from src.ui.modals import ProjectRequirementModal, WipeConfirmModal
 
 # --- DEPENDENT AUTOCOMPLETE FUNCTION ---
@@ -24,12 +25,12 @@ async def admin_item_autocomplete(interaction: discord.Interaction, current: str
     # 2. Decide which DB query to run
     if user_id:
         # Specific User Search
-        records = await interaction.client.db.get_user_items_autocomplete(user_id, current)
+        names = await interaction.client.db.get_user_items_autocomplete(user_id, current)
     else:
         # Global Search (Default)
-        records = await interaction.client.db.item_autocomplete(current)
+        names = await interaction.client.db.item_autocomplete(current)
     
-    return [app_commands.Choice(name=r['name'], value=r['name']) for r in records]
+    return [app_commands.Choice(name=name, value=name) for name in names]
 
 
 class Admin(commands.Cog):
@@ -49,11 +50,14 @@ class Admin(commands.Cog):
     @app_commands.autocomplete(item_name=item_autocomplete, project_name=project_autocomplete)
     @is_officer()
     async def project_add_item(self, interaction: discord.Interaction, project_name: str, item_name: str, amount: int):
+        await interaction.response.defer(ephemeral=True)
         try:
             await self.bot.db.add_project_requirement(project_name, item_name, amount)
-            await interaction.response.send_message(f"✅ Added **{amount}x {item_name}** to {project_name}.", ephemeral=True)
+            invalidate_project_items(project_name)
+            await interaction.followup.send(f"✅ Added **{amount}x {item_name}** to {project_name}.")
+            schedule_dashboard_update(self.bot, interaction.guild, [item_name])
         except ValueError:
-            await interaction.response.send_message(f"❌ Project **{project_name}** not found.", ephemeral=True)
+            await interaction.followup.send(f"❌ Project **{project_name}** not found.")
 
     @app_commands.command(name="project_item_export", description="Get a copy-paste list of current project requirements")
     @app_commands.autocomplete(project_name=project_autocomplete)
@@ -85,22 +89,34 @@ class Admin(commands.Cog):
     @app_commands.autocomplete(output_item=item_autocomplete, input_item=item_autocomplete)
     @is_officer() 
     async def recipe_add(self, interaction: discord.Interaction, output_item: str, input_item: str, ratio: int):
+        if ratio <= 0: return await interaction.response.send_message("❌ Ratio must be positive.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
         await self.bot.db.add_recipe(output_item, input_item, ratio)
-        await interaction.response.send_message(f"✅ Recipe Saved: **{ratio} {input_item}** = 1 **{output_item}**", ephemeral=True)
+        # A recipe can add an input to any project needing the output
+        invalidate_project_items()
+        await interaction.followup.send(f"✅ Recipe Saved: **{ratio} {input_item}** = 1 **{output_item}**")
 
     @app_commands.command(name="dashboard_set", description="Create/Reset the Live Dashboard")
     @is_officer()
     @app_commands.autocomplete(project_name=project_autocomplete)
     async def dashboard_set(self, interaction: discord.Interaction, project_name: str):
         await interaction.response.defer(ephemeral=True)
-        embed = await build_dashboard_embed(self.bot, project_name)
+        embed = await build_dashboard_embed(self.bot, project_name, fresh=True)
         if not embed: return await interaction.followup.send("❌ Empty project.")
         
         msg = await interaction.channel.send(embed=embed)
-        try: await msg.pin()
-        except: pass
-        
-        await self.bot.db.set_dashboard_config(interaction.guild.id, interaction.channel.id, msg.id, project_name)
+
+        async def pin():
+            try: await msg.pin()
+            except: pass
+
+        # Pinning (Discord) and saving the config (DB) don't depend on each other
+        await asyncio.gather(
+            pin(),
+            self.bot.db.set_dashboard_config(interaction.guild.id, interaction.channel.id, msg.id, project_name),
+        )
+        remember_dashboard_message(interaction.guild.id, msg, project_name)
         await interaction.followup.send(f"✅ Dashboard set to **{project_name}**.")
 
     @app_commands.command(name="admin_deposit", description="Give items TO another user")
@@ -110,20 +126,15 @@ class Admin(commands.Cog):
     async def admin_deposit(self, interaction: discord.Interaction, target_user: discord.Member, item_name: str, amount: int):
         if amount <= 0: return await interaction.response.send_message("❌ Positive amounts only.", ephemeral=True)
 
-        await self.bot.db.update_user_stock(target_user.id, item_name, amount)
-        
-        item_id = await self.bot.db.get_item_id_by_name(item_name)
-        async with self.bot.db.pool.acquire() as conn:
-             new_personal = await conn.fetchval("SELECT quantity FROM user_inventory WHERE user_id = $1 AND item_id = $2", target_user.id, item_id)
-        
-        global_total = await self.bot.db.get_global_total(item_name)
+        await interaction.response.defer()
+        new_personal, global_total = await self.bot.db.update_user_stock(target_user.id, item_name, amount)
 
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"👮 **Admin Action:** Deposited **{amount}** {item_name} into {target_user.mention}'s stash.\n"
             f"👤 **Their Total:** {new_personal}\n"
             f"🌍 **Global Stock:** {global_total}"
         )
-        await update_dashboard_message(interaction)
+        schedule_dashboard_update(self.bot, interaction.guild, [item_name])
 
     @app_commands.command(name="admin_withdraw", description="Remove items FROM another user")
     @app_commands.describe(target_user="Who loses the items?", item_name="Which item?", amount="How many?")
@@ -133,16 +144,17 @@ class Admin(commands.Cog):
     async def admin_withdraw(self, interaction: discord.Interaction, target_user: discord.Member, item_name: str, amount: int):
         if amount <= 0: return await interaction.response.send_message("❌ Positive amounts only.", ephemeral=True)
 
+        await interaction.response.defer()
         try:
             new_bal, global_total = await self.bot.db.withdraw_user_stock(target_user.id, item_name, amount)
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"👮 **Admin Action:** Withdrew **{amount}** {item_name} from {target_user.mention}.\n"
                 f"👤 **Their Remaining:** {new_bal}\n"
                 f"🌍 **Global Stock:** {global_total}"
             )
-            await update_dashboard_message(interaction)
+            schedule_dashboard_update(self.bot, interaction.guild, [item_name])
         except ValueError as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            await followup_error(interaction, f"❌ {e}")
 
     @app_commands.command(name="wipe_all_user_stock", description="⚠️ NUCLEAR: Delete ALL user inventory data")
     @is_officer()
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from src.utils import item_autocomplete, project_autocomplete, build_dashboard_embed
+from src.utils import item_autocomplete, project_autocomplete, build_dashboard_embed, resolve_members, followup_error
 
 class Logistics(commands.Cog):
     def __init__(self, bot):
@@ -20,32 +20,32 @@ class Logistics(commands.Cog):
     @app_commands.command(name="locate", description="Find who is holding a specific item")
     @app_commands.autocomplete(item_name=item_autocomplete)
     async def locate(self, interaction: discord.Interaction, item_name: str):
-        # 1. Get Top Holders from DB
+        # DB queries plus a possible member lookup can outlast the 3s response window
+        await interaction.response.defer()
+        # 1. Get Top Holders; each row also carries the item's global total
         rows = await self.bot.db.get_top_holders(item_name)
-        total = await self.bot.db.get_global_total(item_name)
         
         if not rows: 
-            await interaction.response.send_message(f"❌ No one has **{item_name}**.", ephemeral=True)
+            await followup_error(interaction, f"❌ No one has **{item_name}**.")
             return
+        total = rows[0]['total']
 
         embed = discord.Embed(title=f"🔎 Stock Locator: {item_name}", description=f"**Global Total:** {total}", color=discord.Color.gold())
         
+        # Resolve all uncached holders with one gateway request instead of a fetch per row
+        members = await resolve_members(interaction.guild, [r['user_id'] for r in rows])
+
         list_text = ""
         for r in rows:
             user_id = r['user_id']
             qty = r['quantity']
             
-            # Resolve User Name
-            member = interaction.guild.get_member(user_id)
-            if member is None:
-                try: member = await interaction.guild.fetch_member(user_id)
-                except discord.NotFound: member = None
-            
+            member = members.get(user_id)
             name = member.display_name if member else f"Unknown User ({user_id})"
             list_text += f"• **{name}**: {qty}\n"
         
         embed.add_field(name="Top Holders", value=list_text or "None")
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="production", description="Check chain of production for a crafted item")
     @app_commands.autocomplete(item_name=item_autocomplete)
@@ -55,6 +55,7 @@ class Logistics(commands.Cog):
         if not recipe:
             await interaction.response.send_message(f"⚠️ **{item_name}** has no recipe registered.", ephemeral=True)
             return
+        await interaction.response.defer()
 
         input_item = recipe['input_item_name']
         ratio = recipe['quantity_required']
@@ -70,13 +71,10 @@ class Logistics(commands.Cog):
         capable_holders = [h for h in holders if h['quantity'] >= ratio]
         
         if capable_holders:
+            members = await resolve_members(interaction.guild, [r['user_id'] for r in capable_holders])
             text = ""
             for r in capable_holders:
-                member = interaction.guild.get_member(r['user_id'])
-                if not member:
-                    try: member = await interaction.guild.fetch_member(r['user_id'])
-                    except: pass
-                
+                member = members.get(r['user_id'])
                 name = member.display_name if member else "Unknown"
                 can_make = r['quantity'] // ratio
                 text += f"• **{name}**: Has {r['quantity']} {input_item} (Can make **{can_make}**)\n"
@@ -85,7 +83,7 @@ class Logistics(commands.Cog):
         else:
             embed.add_field(name="Status", value=f"❌ No one has enough {input_item} (Need {ratio}).", inline=False)
 
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Logistics(bot))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from src.utils import item_autocomplete, update_dashboard_message
+from src.utils import item_autocomplete, schedule_dashboard_update
 from src.ui.modals import InventoryModal
 
 # --- CUSTOM AUTOCOMPLETE ---
@@ -10,8 +10,8 @@ async def withdraw_autocomplete(interaction: discord.Interaction, current: str):
     Shows ONLY items that the user currently has in their inventory.
     """
     # interaction.client is the bot instance
-    records = await interaction.client.db.get_user_items_autocomplete(interaction.user.id, current)
-    return [app_commands.Choice(name=r['name'], value=r['name']) for r in records]
+    names = await interaction.client.db.get_user_items_autocomplete(interaction.user.id, current)
+    return [app_commands.Choice(name=name, value=name) for name in names]
 
 class Members(commands.Cog):
     def __init__(self, bot):
@@ -72,15 +72,16 @@ class Members(commands.Cog):
             await interaction.response.send_message("You have no items registered.", ephemeral=True)
             return
 
-        export_text = ""
-        for row in rows:
-            export_text += f"{row['item_name']}: {row['quantity']}\n"
+        export_text = "\n".join(f"{r['item_name']}: {r['quantity']}" for r in rows)
+        header = "📋 **Your Inventory Export:**\nCopy the block below to use in `/update_stock` or save as backup."
+        block = f"```{export_text}\n```"
 
-        await interaction.response.send_message(
-            "📋 **Your Inventory Export:**\nCopy the block below to use in `/update_stock` or save as backup.", 
-            ephemeral=True
-        )
-        await interaction.followup.send(f"```{export_text}```", ephemeral=True)
+        # One message when it fits in Discord's 2000 character limit, else the block follows separately
+        if len(header) + 1 + len(block) <= 2000:
+            await interaction.response.send_message(f"{header}\n{block}", ephemeral=True)
+        else:
+            await interaction.response.send_message(header, ephemeral=True)
+            await interaction.followup.send(block, ephemeral=True)
 
     @app_commands.command(name="deposit_item", description="Add items to your current stash (e.g. +50 Scrap)")
     @app_commands.autocomplete(item_name=item_autocomplete)
@@ -89,21 +90,15 @@ class Members(commands.Cog):
             await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
             return
         
-        # Update user stock
-        await self.bot.db.update_user_stock(interaction.user.id, item_name, amount)
-        
-        # We need the new totals for the message
-        # Use simple helper or manual fetch if needed. Here we just grab the global.
-        global_total = await self.bot.db.get_global_total(item_name)
-        
-        # Note: We don't display the user's new total here to save a DB call, 
-        # but you can add 'get_user_stock' to database.py if you really need it.
+        # Update user stock; the new balance and global total come back in the same round-trip
+        new_bal, global_total = await self.bot.db.update_user_stock(interaction.user.id, item_name, amount)
         
         await interaction.response.send_message(
             f"📦 **{interaction.user.display_name}** deposited **{amount}** {item_name}.\n"
+            f"👤 **Your Total:** {new_bal}\n"
             f"🌍 **Global Stock:** {global_total}"
         )
-        await update_dashboard_message(interaction)
+        schedule_dashboard_update(self.bot, interaction.guild, [item_name])
 
     @app_commands.command(name="withdraw_item", description="Remove items from your stash (e.g. -50 Scrap)")
     @app_commands.autocomplete(item_name=withdraw_autocomplete)
@@ -119,7 +114,7 @@ class Members(commands.Cog):
                 f"👤 **Your Remaining:** {new_bal}\n"
                 f"🌍 **Global Stock:** {global_total}"
             )
-            await update_dashboard_message(interaction)
+            schedule_dashboard_update(self.bot, interaction.guild, [item_name])
         except ValueError as e:
             await interaction.response.send_message(f"❌ {e}", ephemeral=True)
 
@@ -130,14 +125,14 @@ class Members(commands.Cog):
             await interaction.response.send_message("❌ Quantity cannot be negative.", ephemeral=True)
             return
 
-        await self.bot.db.set_user_stock(interaction.user.id, item_name, quantity)
-        global_total = await self.bot.db.get_global_total(item_name)
+        # The new global total comes back with the write
+        _, global_total = await self.bot.db.set_user_stock(interaction.user.id, item_name, quantity)
 
         await interaction.response.send_message(
             f"✏️ **{interaction.user.display_name}** updated **{item_name}** to **{quantity}**.\n"
             f"🌍 **Global Stock:** {global_total}"
         )
-        await update_dashboard_message(interaction)
+        schedule_dashboard_update(self.bot, interaction.guild, [item_name])
 
 async def setup(bot):
     await bot.add_cog(Members(bot))
\ No newline at end of file
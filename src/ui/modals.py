@@ -1,29 +1,39 @@
+import re
 import discord
 from discord import ui
-from src.utils import update_dashboard_message
+from src.utils import schedule_dashboard_update, invalidate_project_items
+
+# One "Item Name: 1,234" entry per line; malformed lines simply don't match
+LINE_RE = re.compile(r'^[^\S\n]*([^:\n]+?)[^\S\n]*:[^\S\n]*(-?\d[\d,]*)[^\S\n]*$', re.M)
+
+def parse_lines(text):
+    """Returns ([(name, qty), ...], skipped) where skipped counts non-blank lines that didn't parse."""
+    rows = [(name, int(qty.replace(',', ''))) for name, qty in LINE_RE.findall(text)]
+    non_blank = sum(1 for line in text.splitlines() if line.strip())
+    return rows, non_blank - len(rows)
 
 class InventoryModal(ui.Modal, title="Update Inventory"):
     inventory_input = ui.TextInput(label="Paste (Item: Qty)", style=discord.TextStyle.paragraph, placeholder="Scrap: 500\nGold: 10", required=True)
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        lines = self.inventory_input.value.split('\n')
-        updated_count = 0
+        # Parse everything first, then write the whole paste in one batch
+        rows, skipped = parse_lines(self.inventory_input.value)
         errors = []
+        if skipped: errors.append(f"Skipped {skipped} line(s) not in 'Item: Qty' format")
 
-        for line in lines:
-            if ":" in line:
-                try:
-                    name, qty = line.split(":", 1)
-                    await interaction.client.db.update_user_stock(interaction.user.id, name.strip(), int(qty.strip().replace(',', '')))
-                    updated_count += 1
-                except Exception as e:
-                    errors.append(f"Error '{line}': {e}")
+        updated_count = 0
+        if rows:
+            try:
+                await interaction.client.db.bulk_update_user_stock(interaction.user.id, rows)
+                updated_count = len(rows)
+            except Exception as e:
+                errors.append(f"Error saving inventory: {e}")
         
         msg = f"✅ Updated {updated_count} items."
         if errors: msg += "\n⚠️ " + "\n".join(errors[:3])
         await interaction.followup.send(msg)
-        await update_dashboard_message(interaction)
+        schedule_dashboard_update(interaction.client, interaction.guild, [name for name, _ in rows])
 
 class ProjectRequirementModal(ui.Modal, title="Bulk Edit Requirements"):
     def __init__(self, project_name):
@@ -34,17 +44,19 @@ class ProjectRequirementModal(ui.Modal, title="Bulk Edit Requirements"):
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        lines = self.requirements_input.value.split('\n')
+        rows, skipped = parse_lines(self.requirements_input.value)
         count = 0
-        for line in lines:
-            if ":" in line:
-                try:
-                    name, qty = line.split(":", 1)
-                    await interaction.client.db.add_project_requirement(self.project_name, name.strip(), int(qty.strip().replace(',', '')))
-                    count += 1
-                except: pass
-        await interaction.followup.send(f"✅ Updated {count} requirements for {self.project_name}.")
-        await update_dashboard_message(interaction)
+        if rows:
+            try:
+                await interaction.client.db.bulk_set_project_requirements(self.project_name, rows)
+                invalidate_project_items(self.project_name)
+                count = len(rows)
+            except ValueError as e:
+                return await interaction.followup.send(f"❌ {e}")
+        msg = f"✅ Updated {count} requirements for {self.project_name}."
+        if skipped: msg += f"\n⚠️ Skipped {skipped} line(s) not in 'Item: Qty' format"
+        await interaction.followup.send(msg)
+        schedule_dashboard_update(interaction.client, interaction.guild)
 
 class WipeConfirmModal(ui.Modal, title="⚠️ CONFIRM WIPE"):
     confirmation = ui.TextInput(label="Type 'DELETE EVERYTHING'", placeholder="DELETE EVERYTHING", required=True)
@@ -56,4 +68,4 @@ class WipeConfirmModal(ui.Modal, title="⚠️ CONFIRM WIPE"):
         await interaction.response.defer(ephemeral=True)
         await interaction.client.db.wipe_all_inventory()
         await interaction.followup.send("💥 **System Wiped.**")
-        await update_dashboard_message(interaction)
\ No newline at end of file
+        schedule_dashboard_update(interaction.client, interaction.guild)
\ No newline at end of file
@@ -1,9 +1,13 @@
+import asyncio
+import logging
+import time
 import discord
 from discord import app_commands
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
+logger = logging.getLogger("Utils")
 OFFICER_ROLE_ID = int(os.getenv("OFFICER_ROLE_ID", 0))
 
 # --- PERMISSIONS ---
@@ -11,69 +15,222 @@ def is_officer():
     def predicate(interaction: discord.Interaction) -> bool:
         if interaction.user.guild_permissions.administrator:
             return True
-        return any(role.id == OFFICER_ROLE_ID for role in interaction.user.roles)
+        # get_role is a dict lookup; an unset role ID (0) never matches, so only admins pass
+        return bool(OFFICER_ROLE_ID) and interaction.user.get_role(OFFICER_ROLE_ID) is not None
     return app_commands.check(predicate)
 
 # --- AUTOCOMPLETE HELPERS ---
 async def item_autocomplete(interaction: discord.Interaction, current: str):
     # interaction.client refers to the 'bot' instance
-    records = await interaction.client.db.item_autocomplete(current)
-    return [app_commands.Choice(name=r['name'], value=r['name']) for r in records]
+    names = await interaction.client.db.item_autocomplete(current)
+    return [app_commands.Choice(name=name, value=name) for name in names]
 
 async def project_autocomplete(interaction: discord.Interaction, current: str):
-    records = await interaction.client.db.project_autocomplete(current)
-    return [app_commands.Choice(name=r['name'], value=r['name']) for r in records]
+    names = await interaction.client.db.project_autocomplete(current)
+    return [app_commands.Choice(name=name, value=name) for name in names]
+
+# --- RESPONSES ---
+async def followup_error(interaction: discord.Interaction, message: str):
+    """
+    Error reply for a handler that already deferred publicly: removes the
+    "thinking..." placeholder and answers privately instead.
+    """
+    try: await interaction.delete_original_response()
+    except discord.HTTPException: pass
+    await interaction.followup.send(message, ephemeral=True)
+
+# --- MEMBER LOOKUP ---
+# Found members land in discord.py's member cache (cache=True). Ids the gateway
+# couldn't find (people who left the server) are remembered here for a while so
+# every /locate doesn't ask for them again.
+MISSING_MEMBER_TTL_SECONDS = 300
+_missing_members: dict[int, float] = {}
+
+async def resolve_members(guild: discord.Guild, user_ids) -> dict:
+    """
+    Maps user_id -> Member, trying the member cache first and resolving
+    any misses with a single gateway request instead of a fetch per id.
+    """
+    now = time.monotonic()
+    members = {}
+    missing = []
+    for user_id in user_ids:
+        member = guild.get_member(user_id)
+        if member: members[user_id] = member
+        elif now - _missing_members.get(user_id, 0) >= MISSING_MEMBER_TTL_SECONDS:
+            missing.append(user_id)
+    if missing:
+        try:
+            fetched = await guild.query_members(user_ids=missing, limit=len(missing), cache=True)
+        except asyncio.TimeoutError:
+            # Gateway didn't answer in time: fall back to REST, all fetches at once
+            results = await asyncio.gather(*(guild.fetch_member(user_id) for user_id in missing), return_exceptions=True)
+            fetched = [m for m in results if isinstance(m, discord.Member)]
+        members.update({m.id: m for m in fetched})
+        _missing_members.update({user_id: now for user_id in missing if user_id not in members})
+    return members
 
 # --- DASHBOARD LOGIC ---
-async def build_dashboard_embed(bot, project_name):
-    # Retrieve data using the Database Manager
-    reqs = await bot.db.get_project_requirements(project_name)
+BAR_LEN = 12
+# Every possible bar keyed by (ready cells, craftable cells), so rendering a row is one lookup
+_BAR_CACHE = {
+    (i, j): "▓" * i + "▒" * j + "░" * (BAR_LEN - i - j)
+    for i in range(BAR_LEN + 1) for j in range(BAR_LEN + 1 - i)
+}
+
+def render_bar(direct, potential, target):
+    """Ready/craftable/empty bar using integer math only (an empty target renders as empty)."""
+    if target <= 0: return _BAR_CACHE[0, 0]
+    filled_direct = max(0, min(BAR_LEN, direct * BAR_LEN // target))
+    filled_potential = max(0, min(BAR_LEN - filled_direct, potential * BAR_LEN // target))
+    return _BAR_CACHE[filled_direct, filled_potential]
+
+# project_name -> (built_at, embed). Bursts of /status for the same project share one build.
+DASHBOARD_CACHE_SECONDS = 10
+_dashboard_embed_cache: dict[str, tuple[float, discord.Embed]] = {}
+# project_name -> build in progress, so concurrent cold /status calls wait on one query
+_dashboard_builds: dict[str, asyncio.Task] = {}
+
+# project_name -> every item its dashboard reads (requirements + recipe inputs),
+# so writes to unrelated items don't trigger a rebuild
+_project_items: dict[str, frozenset[str]] = {}
+# project_name (None = every project) -> times invalidated, so a build that started
+# before an invalidation doesn't store what it read
+_project_item_generations: "dict[str | None, int]" = {}
+
+def _items_generation(project_name):
+    return _project_item_generations.get(None, 0), _project_item_generations.get(project_name, 0)
+
+def invalidate_project_items(project_name=None):
+    """
+    Forgets which items a project depends on and its cached embed (all projects
+    if no name), so its next write always refreshes and /status rebuilds.
+    """
+    _project_item_generations[project_name] = _project_item_generations.get(project_name, 0) + 1
+    if project_name is None:
+        _project_items.clear()
+        _dashboard_embed_cache.clear()
+    else:
+        _project_items.pop(project_name, None)
+        _dashboard_embed_cache.pop(project_name, None)
+
+def invalidate_item_embeds(item_names=None):
+    """Drops cached embeds of every project reading any of `item_names` (all of them if None)."""
+    if item_names is None:
+        _dashboard_embed_cache.clear()
+        return
+    for project_name in list(_dashboard_embed_cache):
+        used = _project_items.get(project_name)
+        if used is None or not used.isdisjoint(item_names):
+            del _dashboard_embed_cache[project_name]
+
+async def build_dashboard_embed(bot, project_name, fresh=False):
+    """
+    Returns the project status embed, or None for an unknown/empty project.
+    Reuses an embed built in the last few seconds unless `fresh` is set;
+    the live dashboard always rebuilds, which also refreshes the cache.
+    """
+    if not fresh:
+        cached = _dashboard_embed_cache.get(project_name)
+        if cached and time.monotonic() - cached[0] < DASHBOARD_CACHE_SECONDS:
+            return cached[1].copy()
+        building = _dashboard_builds.get(project_name)
+        if building:
+            # Shielded so one caller timing out doesn't cancel the build for the others
+            embed = await asyncio.shield(building)
+            return embed.copy() if embed else None
+
+    generation = _items_generation(project_name)
+    task = asyncio.create_task(_render_dashboard_embed(bot, project_name))
+    _dashboard_builds[project_name] = task
+    try:
+        embed = await asyncio.shield(task)
+    finally:
+        if _dashboard_builds.get(project_name) is task:
+            del _dashboard_builds[project_name]
+    if embed:
+        if _items_generation(project_name) == generation:
+            _dashboard_embed_cache[project_name] = (time.monotonic(), embed)
+        return embed.copy()
+    _dashboard_embed_cache.pop(project_name, None)
+    return None
+
+def _allocate_surplus(surplus, outputs):
+    """
+    Splits one input's surplus between the (item, raw_needed, ratio) outputs crafted from it.
+    Short of covering every output's remaining need, each gets a share proportional to that
+    need; anything beyond is handed out as an equal number of extra crafts per output.
+    Rounding leftovers go to the first output, so the shares always add up to the surplus
+    (a single output gets all of it).
+
+    >>> _allocate_surplus(10, [('A', 0, 3)])
+    {'A': 10}
+    >>> _allocate_surplus(10, [('A', 3, 3)])
+    {'A': 10}
+    >>> _allocate_surplus(7, [('A', 30, 3), ('B', 30, 3)])
+    {'A': 4, 'B': 3}
+    >>> _allocate_surplus(100, [('A', 40, 10), ('B', 20, 5)])
+    {'A': 70, 'B': 30}
+    """
+    total_need = sum(need for _, need, _ in outputs)
+    if surplus <= total_need:
+        shares = {item: surplus * need // total_need if total_need else 0 for item, need, _ in outputs}
+    else:
+        extra_crafts = (surplus - total_need) // sum(ratio for _, _, ratio in outputs)
+        shares = {item: need + extra_crafts * ratio for item, need, ratio in outputs}
+    shares[outputs[0][0]] += surplus - sum(shares.values())
+    return shares
+
+async def _render_dashboard_embed(bot, project_name):
+    generation = _items_generation(project_name)
+    # One round-trip: totals and recipe inputs come back with each requirement
+    reqs = await bot.db.get_project_status(project_name)
     if not reqs: return None
 
-    requirements_map = {row['item_name']: row['target_amount'] for row in reqs}
+    # Records are tuples underneath: unpack by position (see get_project_status column order)
+    requirements_map = {item: target for item, target, *_ in reqs}
+    # Requirements or recipes changed mid-query: leave the set unknown so writes keep refreshing
+    if _items_generation(project_name) == generation:
+        _project_items[project_name] = frozenset(requirements_map) | {r[3] for r in reqs if r[3]}
     embed = discord.Embed(title=f"🚀 Project Status: {project_name}", color=discord.Color.blue())
     min_project_sets = None
 
-    for req in reqs:
-        item = req['item_name']
-        target = req['target_amount']
-        
-        direct = await bot.db.get_global_total(item)
-        recipe = await bot.db.get_recipe(item)
-        
+    # Raw material left after the project's own direct need for it, worked out once per input,
+    # then shared between the outputs crafted from it (see _allocate_surplus)
+    surplus_by_input = {}
+    outputs_by_input = {}
+    for item, target, direct, input_item_name, ratio, raw_total in reqs:
+        if input_item_name:
+            surplus_by_input[input_item_name] = max(0, raw_total - requirements_map.get(input_item_name, 0))
+            outputs_by_input.setdefault(input_item_name, []).append((item, max(0, target - direct) * ratio, ratio))
+    surplus_by_output = {}
+    for input_item_name, outputs in outputs_by_input.items():
+        surplus_by_output.update(_allocate_surplus(surplus_by_input[input_item_name], outputs))
+
+    for item, target, direct, input_item_name, ratio, raw_total in reqs:
         potential = 0
-        input_item_name = None
         surplus_raw = 0
         
-        if recipe:
-            input_item_name = recipe['input_item_name']
-            ratio = recipe['quantity_required']
-            raw_total = await bot.db.get_global_total(input_item_name)
-            raw_needed_directly = requirements_map.get(input_item_name, 0)
-            surplus_raw = max(0, raw_total - raw_needed_directly)
+        if input_item_name:
+            surplus_raw = surplus_by_output[item]
             potential = surplus_raw // ratio
         
         total_ready = direct + potential
-        percent = min(100, int((total_ready / target) * 100))
+        percent = min(100, total_ready * 100 // target) if target > 0 else 100
 
         if target > 0:
             current_item_sets = total_ready // target
             if min_project_sets is None or current_item_sets < min_project_sets:
                 min_project_sets = current_item_sets
         
-        bar_len = 12
-        filled_direct = min(bar_len, int((direct / target) * bar_len))
-        remaining_space = bar_len - filled_direct
-        filled_potential = min(remaining_space, int((potential / target) * bar_len))
-        empty = bar_len - filled_direct - filled_potential
-        bar = "▓" * filled_direct + "▒" * filled_potential + "░" * empty
+        bar = render_bar(direct, potential, target)
         
-        status_text = f"`{bar}` **{percent}%**\n• **Ready:** {direct} / {target}\n"
+        lines = [f"`{bar}` **{percent}%**", f"• **Ready:** {direct} / {target}"]
         if potential > 0:
-            status_text += f"• **Potential:** +{potential} (from {surplus_raw} excess {input_item_name})\n"
-        elif recipe:
-             raw_total_debug = await bot.db.get_global_total(input_item_name)
-             if raw_total_debug > 0: status_text += f"• *Raw materials reserved*\n"
+            lines.append(f"• **Potential:** +{potential} (from {surplus_raw} excess {input_item_name})")
+        elif input_item_name and raw_total > 0:
+            lines.append("• *Raw materials reserved*")
+        status_text = "\n".join(lines) + "\n"
 
         embed.add_field(name=item, value=status_text, inline=False)
         
@@ -82,21 +239,75 @@ async def build_dashboard_embed(bot, project_name):
     embed.set_footer(text="Updates live • ▓ = Ready, ▒ = Craftable")
     return embed
 
-async def update_dashboard_message(interaction_or_guild):
-    # Handle both interaction objects and guild objects
-    guild = interaction_or_guild.guild if isinstance(interaction_or_guild, discord.Interaction) else interaction_or_guild
-    # We need the bot instance. If it's a guild, we assume the bot is passed or accessible differently.
-    # Hack: getting bot from guild.me or the interaction client
-    bot = interaction_or_guild.client if isinstance(interaction_or_guild, discord.Interaction) else interaction_or_guild.me._state._get_client()
+# guild_id -> dashboard message (full or partial), so updates can edit it directly
+_dashboard_messages: "dict[int, discord.Message | discord.PartialMessage]" = {}
+# guild_id -> (message_id, embed dict) last sent, so unchanged dashboards aren't re-edited
+_last_dashboard_embeds: dict[int, tuple[int, dict]] = {}
+# guild_id -> project shown on its dashboard
+_dashboard_projects: dict[int, str] = {}
 
+def remember_dashboard_message(guild_id: int, message: discord.Message, project_name: str):
+    _dashboard_messages[guild_id] = message
+    _dashboard_projects[guild_id] = project_name
+
+async def update_dashboard_message(bot, guild: discord.Guild):
     config = await bot.db.get_dashboard_config(guild.id)
     if not config: return
+    _dashboard_projects[guild.id] = config['project_name']
 
-    channel = guild.get_channel(config['dashboard_channel_id'])
-    if not channel: return
     try:
-        message = await channel.fetch_message(config['dashboard_message_id'])
-        new_embed = await build_dashboard_embed(bot, config['project_name'])
-        if new_embed: await message.edit(embed=new_embed)
+        message = _dashboard_messages.get(guild.id)
+        if message is None or message.id != config['dashboard_message_id']:
+            channel = guild.get_channel(config['dashboard_channel_id'])
+            if not channel: return
+            # A partial message can be edited without fetching it first; NotFound surfaces on edit
+            message = channel.get_partial_message(config['dashboard_message_id'])
+            _dashboard_messages[guild.id] = message
+        new_embed = await build_dashboard_embed(bot, config['project_name'], fresh=True)
+        if not new_embed: return
+        # Edits are rate-limited; skip them when nothing visible changed
+        sent = (message.id, new_embed.to_dict())
+        if _last_dashboard_embeds.get(guild.id) == sent: return
+        await message.edit(embed=new_embed)
+        _last_dashboard_embeds[guild.id] = sent
     except discord.NotFound:
-        pass
\ No newline at end of file
+        # Dashboard message was deleted; forget it until /dashboard_set posts a new one
+        _dashboard_messages.pop(guild.id, None)
+        _last_dashboard_embeds.pop(guild.id, None)
+
+# --- DASHBOARD DEBOUNCE ---
+DASHBOARD_DEBOUNCE_SECONDS = 2
+_pending_dashboard_updates: dict[int, asyncio.Task] = {}
+# guild_id -> lock held while a refresh runs, so a slow edit and the next refresh never overlap
+_dashboard_locks: dict[int, asyncio.Lock] = {}
+
+def schedule_dashboard_update(bot, guild: discord.Guild, item_names=None):
+    """
+    Queues a dashboard refresh for the guild. Every call inside the same
+    window is coalesced into the one pending refresh, so a burst of
+    deposits results in a single rebuild + edit.
+    Pass the `item_names` a write touched to skip the refresh when the
+    dashboard's project doesn't use any of them. Cached /status embeds
+    reading those items are dropped either way.
+    """
+    invalidate_item_embeds(item_names)
+    if item_names is not None:
+        used = _project_items.get(_dashboard_projects.get(guild.id))
+        if used is not None and used.isdisjoint(item_names):
+            return
+    pending = _pending_dashboard_updates.get(guild.id)
+    if pending and not pending.done():
+        return
+
+    async def _run():
+        await asyncio.sleep(DASHBOARD_DEBOUNCE_SECONDS)
+        # Leave the slot before rebuilding so writes landing mid-edit queue a fresh refresh
+        _pending_dashboard_updates.pop(guild.id, None)
+        # Nothing awaits this task, so failures have to be logged here or they vanish
+        try:
+            async with _dashboard_locks.setdefault(guild.id, asyncio.Lock()):
+                await update_dashboard_message(bot, guild)
+        except Exception:
+            logger.exception(f"Dashboard update failed for guild {guild.id}")
+
+    _pending_dashboard_updates[guild.id] = asyncio.create_task(_run())